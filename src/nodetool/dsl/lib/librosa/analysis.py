@@ -30,10 +30,16 @@ class AmplitudeToDB(SingleOutputGraphNode[types.NPArray], GraphNode[types.NPArra
     - Preparing input for audio models that expect dB-scaled data
     """
 
+    DBPrecision: typing.ClassVar[type] = nodetool.nodes.lib.librosa.analysis.DBPrecision
+
     tensor: types.NPArray | OutputHandle[types.NPArray] = connect_field(
         default=types.NPArray(type="np_array", value=None, dtype="<i8", shape=(1,)),
         description="The amplitude tensor to be converted to dB scale.",
     )
+    precision: nodetool.nodes.lib.librosa.analysis.DBPrecision = Field(
+        default=nodetool.nodes.lib.librosa.analysis.DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     @classmethod
     def get_node_class(cls) -> type[BaseNode]:
@@ -101,10 +107,16 @@ class DBToAmplitude(SingleOutputGraphNode[types.NPArray], GraphNode[types.NPArra
     - Preparing data for models that expect linear amplitude scaling
     """
 
+    DBPrecision: typing.ClassVar[type] = nodetool.nodes.lib.librosa.analysis.DBPrecision
+
     tensor: types.NPArray | OutputHandle[types.NPArray] = connect_field(
         default=types.NPArray(type="np_array", value=None, dtype="<i8", shape=(1,)),
         description="The dB-scaled tensor to be converted to amplitude scale.",
     )
+    precision: nodetool.nodes.lib.librosa.analysis.DBPrecision = Field(
+        default=nodetool.nodes.lib.librosa.analysis.DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     @classmethod
     def get_node_class(cls) -> type[BaseNode]:
@@ -133,10 +145,16 @@ class DBToPower(SingleOutputGraphNode[types.NPArray], GraphNode[types.NPArray]):
     - Preparing data for models that expect power-scaled data
     """
 
+    DBPrecision: typing.ClassVar[type] = nodetool.nodes.lib.librosa.analysis.DBPrecision
+
     tensor: types.NPArray | OutputHandle[types.NPArray] = connect_field(
         default=types.NPArray(type="np_array", value=None, dtype="<i8", shape=(1,)),
         description="The tensor containing the decibel spectrogram.",
     )
+    precision: nodetool.nodes.lib.librosa.analysis.DBPrecision = Field(
+        default=nodetool.nodes.lib.librosa.analysis.DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     @classmethod
     def get_node_class(cls) -> type[BaseNode]:
@@ -314,6 +332,10 @@ class PlotSpectrogram(SingleOutputGraphNode[types.ImageRef], GraphNode[types.Ima
     - Sound engineering: Helps in identifying specific tones or frequencies in a music piece or a sound bite.
     """
 
+    ImageFormat: typing.ClassVar[type] = (
+        nodetool.nodes.lib.librosa.analysis.PlotSpectrogram.ImageFormat
+    )
+
     tensor: types.NPArray | OutputHandle[types.NPArray] = connect_field(
         default=types.NPArray(type="np_array", value=None, dtype="<i8", shape=(1,)),
         description="The tensor containing the mel spectrogram.",
@@ -321,6 +343,13 @@ class PlotSpectrogram(SingleOutputGraphNode[types.ImageRef], GraphNode[types.Ima
     fmax: int | OutputHandle[int] = connect_field(
         default=8000, description="The highest frequency (in Hz)."
     )
+    format: nodetool.nodes.lib.librosa.analysis.PlotSpectrogram.ImageFormat = Field(
+        default=nodetool.nodes.lib.librosa.analysis.PlotSpectrogram.ImageFormat.PNG,
+        description="Image format. JPEG and WebP are lossy but faster to encode.",
+    )
+    compress_level: int | OutputHandle[int] = connect_field(
+        default=1, description="PNG compression level (0 is fastest, 9 is smallest)."
+    )
 
     @classmethod
     def get_node_class(cls) -> type[BaseNode]:
@@ -345,10 +374,16 @@ class PowertToDB(SingleOutputGraphNode[types.NPArray], GraphNode[types.NPArray])
     audio, analysis, decibel, spectrogram
     """
 
+    DBPrecision: typing.ClassVar[type] = nodetool.nodes.lib.librosa.analysis.DBPrecision
+
     tensor: types.NPArray | OutputHandle[types.NPArray] = connect_field(
         default=types.NPArray(type="np_array", value=None, dtype="<i8", shape=(1,)),
         description="The tensor containing the power spectrogram.",
     )
+    precision: nodetool.nodes.lib.librosa.analysis.DBPrecision = Field(
+        default=nodetool.nodes.lib.librosa.analysis.DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     @classmethod
     def get_node_class(cls) -> type[BaseNode]:
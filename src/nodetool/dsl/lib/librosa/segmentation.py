@@ -29,8 +29,19 @@ class DetectOnsets(SingleOutputGraphNode[types.NPArray], GraphNode[types.NPArray
     - Identify beat locations in music
     - Segment audio based on changes in energy or spectral content
     - Prepare audio for further processing or analysis
+
+    The time domain mode uses the rise of the amplitude envelope instead of
+    spectral flux. It is much faster on long recordings and is sufficient for
+    gross transients such as drum hits or the end of silence.
+
+    Setting `lag` and `max_size` above 1 turns spectral flux into SuperFlux,
+    which suppresses false onsets caused by vibrato.
     """
 
+    OnsetDetectionMode: typing.ClassVar[type] = (
+        nodetool.nodes.lib.librosa.segmentation.DetectOnsets.OnsetDetectionMode
+    )
+
     audio: types.AudioRef | OutputHandle[types.AudioRef] = connect_field(
         default=types.AudioRef(
             type="audio", uri="", asset_id=None, data=None, metadata=None
@@ -40,6 +51,20 @@ class DetectOnsets(SingleOutputGraphNode[types.NPArray], GraphNode[types.NPArray
     hop_length: int | OutputHandle[int] = connect_field(
         default=512, description="Number of samples between successive frames."
     )
+    mode: nodetool.nodes.lib.librosa.segmentation.DetectOnsets.OnsetDetectionMode = (
+        Field(
+            default=nodetool.nodes.lib.librosa.segmentation.DetectOnsets.OnsetDetectionMode.SPECTRAL_FLUX,
+            description="Onset detection function (spectral_flux, time_domain).",
+        )
+    )
+    lag: int | OutputHandle[int] = connect_field(
+        default=1,
+        description="Time lag in frames for computing spectral flux differences.",
+    )
+    max_size: int | OutputHandle[int] = connect_field(
+        default=1,
+        description="Size in frequency bins of the local max filter. Values above 1 enable SuperFlux.",
+    )
 
     @classmethod
     def get_node_class(cls) -> type[BaseNode]:
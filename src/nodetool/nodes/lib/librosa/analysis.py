@@ -1,16 +1,56 @@
+from enum import Enum
 import librosa
 import numpy as np
 from pydantic import Field
 from nodetool.metadata.types import AudioRef, NPArray
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.processing_context import ProcessingContext
-from nodetool.media.audio.audio_helpers import (
-    convert_to_float,
+from nodetool.nodes.lib.librosa.cache import (
+    cached_audio_to_numpy,
+    cached_magnitude_spectrogram,
 )
 from nodetool.metadata.types import ImageRef
 from typing import Any, Optional
 
 
+class DBPrecision(Enum):
+    FP32 = "fp32"
+    FP64 = "fp64"
+
+
+def _to_db(
+    tensor: np.ndarray, multiplier: float, amin: float, magnitude: bool
+) -> np.ndarray:
+    """
+    float32 equivalent of librosa's power_to_db / amplitude_to_db with
+    ``ref=np.max`` and ``top_db=80``, computed in place on one buffer.
+    """
+    if np.iscomplexobj(tensor):
+        db = np.abs(tensor).astype(np.float32)
+    else:
+        db = np.array(tensor, dtype=np.float32)
+        if magnitude:
+            np.abs(db, out=db)
+    ref = max(float(db.max()), amin)
+    np.maximum(db, np.float32(amin), out=db)
+    np.log10(db, out=db)
+    db *= np.float32(multiplier)
+    db -= np.float32(multiplier * np.log10(ref))
+    np.maximum(db, db.max() - np.float32(80.0), out=db)
+    return db
+
+
+def _from_db(tensor: np.ndarray, multiplier: float) -> np.ndarray:
+    """
+    float32 equivalent of librosa's db_to_power / db_to_amplitude with
+    ``ref=1.0``.
+    """
+    scale = np.array(tensor, dtype=np.float32)
+    scale *= np.float32(multiplier)
+    np.power(np.float32(10.0), scale, out=scale)
+    return scale
+
+
 class AmplitudeToDB(BaseNode):
     """
     Converts an amplitude spectrogram to a dB-scaled spectrogram.
@@ -25,9 +65,16 @@ class AmplitudeToDB(BaseNode):
         default=NPArray(),
         description="The amplitude tensor to be converted to dB scale.",
     )
+    precision: DBPrecision = Field(
+        default=DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     async def process(self, context: ProcessingContext) -> NPArray:
-        db_tensor = librosa.amplitude_to_db(self.tensor.to_numpy(), ref=np.max)
+        if self.precision == DBPrecision.FP32:
+            db_tensor = _to_db(self.tensor.to_numpy(), 20.0, 1e-5, magnitude=True)
+        else:
+            db_tensor = librosa.amplitude_to_db(self.tensor.to_numpy(), ref=np.max)
         return NPArray.from_numpy(db_tensor)
 
 
@@ -52,10 +99,12 @@ class ChromaSTFT(BaseNode):
     )
 
     async def process(self, context: ProcessingContext) -> NPArray:
-        samples, sample_rate, num_channels = await context.audio_to_numpy(self.audio)
-        samples = convert_to_float(samples)
+        samples, sample_rate, _ = await cached_audio_to_numpy(context, self.audio)
+        magnitude = cached_magnitude_spectrogram(
+            context, self.audio, samples, self.n_fft, self.hop_length
+        )
         chromagram = librosa.feature.chroma_stft(
-            y=samples, sr=sample_rate, n_fft=self.n_fft, hop_length=self.hop_length
+            S=np.square(magnitude), sr=sample_rate, hop_length=self.hop_length
         )
         return NPArray.from_numpy(chromagram)
 
@@ -73,9 +122,16 @@ class DBToAmplitude(BaseNode):
         default=NPArray(),
         description="The dB-scaled tensor to be converted to amplitude scale.",
     )
+    precision: DBPrecision = Field(
+        default=DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     async def process(self, context: ProcessingContext) -> NPArray:
-        amplitude_tensor = librosa.db_to_amplitude(self.tensor.to_numpy())
+        if self.precision == DBPrecision.FP32:
+            amplitude_tensor = _from_db(self.tensor.to_numpy(), 0.05)
+        else:
+            amplitude_tensor = librosa.db_to_amplitude(self.tensor.to_numpy())
         return NPArray.from_numpy(amplitude_tensor)
 
 
@@ -92,9 +148,15 @@ class DBToPower(BaseNode):
     tensor: NPArray = Field(
         default=NPArray(), description="The tensor containing the decibel spectrogram."
     )
+    precision: DBPrecision = Field(
+        default=DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     async def process(self, context: ProcessingContext) -> NPArray:
         db_spec = self.tensor.to_numpy()
+        if self.precision == DBPrecision.FP32:
+            return NPArray.from_numpy(_from_db(db_spec, 0.1))
         return NPArray.from_numpy(librosa.db_to_power(db_spec))
 
 
@@ -135,9 +197,64 @@ class GriffinLim(BaseNode):
         description="If given, the resulting signal will be zero-padded or clipped to this length.",
     )
 
+    def _griffinlim_torch(self, magnitude: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Runs Griffin-Lim with torchaudio's batched FFTs if it is installed.
+        Returns None when torchaudio is unavailable or cannot handle the
+        requested parameters, in which case librosa is used instead.
+
+        torchaudio's inner STFT pads the signal with reflect padding, while
+        librosa pads with zeros, so the two paths can differ in the first
+        and last half window of the output.
+        """
+        try:
+            import torch
+            import torchaudio
+        except ImportError:
+            return None
+
+        n_fft = 2 * (magnitude.shape[-2] - 1)
+        win_length = self.win_length or n_fft
+        # torch.istft always centers frames and rejects hops that leave gaps
+        # between windows.
+        if not self.center or self.hop_length > win_length:
+            return None
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        window = torch.from_numpy(
+            librosa.filters.get_window(self.window, win_length, fftbins=True)
+        ).to(device=device, dtype=torch.float32)
+        # Copies, since the input may be a read-only cached spectrogram
+        spec = torch.tensor(magnitude, dtype=torch.float32)
+        reconstructed = torchaudio.functional.griffinlim(
+            spec.to(device),
+            window=window,
+            n_fft=n_fft,
+            hop_length=self.hop_length,
+            win_length=win_length,
+            power=1.0,
+            n_iter=self.n_iter,
+            momentum=0.99,
+            length=None,
+            rand_init=True,
+        )
+        reconstructed_audio = reconstructed.cpu().numpy()
+        # torchaudio applies `length` to every inner istft, which breaks the
+        # stft round trip, so the output is padded or trimmed afterwards.
+        if self.length is not None:
+            reconstructed_audio = librosa.util.fix_length(
+                reconstructed_audio, size=self.length
+            )
+        return reconstructed_audio
+
     async def process(self, context: ProcessingContext) -> NPArray:
+        magnitude = self.magnitude_spectrogram.to_numpy()
+        reconstructed_audio = self._griffinlim_torch(magnitude)
+        if reconstructed_audio is not None:
+            return NPArray.from_numpy(reconstructed_audio)
+
         reconstructed_audio = librosa.griffinlim(
-            S=self.magnitude_spectrogram.to_numpy(),
+            S=magnitude,
             n_iter=self.n_iter,
             hop_length=self.hop_length,
             win_length=self.win_length,
@@ -174,13 +291,13 @@ class MelSpectrogram(BaseNode):
     fmax: int = Field(default=8000, ge=0, description="The highest frequency (in Hz).")
 
     async def process(self, context: ProcessingContext) -> NPArray:
-        samples, sample_rate, num_channels = await context.audio_to_numpy(self.audio)
-        samples = convert_to_float(samples)
+        samples, sample_rate, _ = await cached_audio_to_numpy(context, self.audio)
+        magnitude = cached_magnitude_spectrogram(
+            context, self.audio, samples, self.n_fft, self.hop_length
+        )
         melspectrogram = librosa.feature.melspectrogram(
-            y=samples,
+            S=np.square(magnitude),
             sr=sample_rate,
-            n_fft=self.n_fft,
-            hop_length=self.hop_length,
             n_mels=self.n_mels,
             fmin=self.fmin,
             fmax=self.fmax,
@@ -212,16 +329,16 @@ class MFCC(BaseNode):
     fmax: int = Field(default=8000, ge=0, description="The highest frequency (in Hz).")
 
     async def process(self, context: ProcessingContext) -> NPArray:
-        samples, sample_rate, num_channels = await context.audio_to_numpy(self.audio)
-        samples = convert_to_float(samples)
+        samples, sample_rate, _ = await cached_audio_to_numpy(context, self.audio)
+        magnitude = cached_magnitude_spectrogram(
+            context, self.audio, samples, self.n_fft, self.hop_length
+        )
+        # mfcc expects a log-power mel spectrogram when given S
+        melspectrogram = librosa.feature.melspectrogram(
+            S=np.square(magnitude), sr=sample_rate, fmin=self.fmin, fmax=self.fmax
+        )
         mfccs = librosa.feature.mfcc(
-            y=samples,
-            sr=sample_rate,
-            n_mfcc=self.n_mfcc,
-            n_fft=self.n_fft,
-            hop_length=self.hop_length,
-            fmin=self.fmin,
-            fmax=self.fmax,
+            S=librosa.power_to_db(melspectrogram), n_mfcc=self.n_mfcc
         )
         return NPArray.from_numpy(mfccs)
 
@@ -241,33 +358,61 @@ class PlotSpectrogram(BaseNode):
     - Sound engineering: Helps in identifying specific tones or frequencies in a music piece or a sound bite.
     """
 
+    class ImageFormat(Enum):
+        PNG = "png"
+        JPEG = "jpeg"
+        WEBP = "webp"
+
     tensor: NPArray = Field(
         default=NPArray(), description="The tensor containing the mel spectrogram."
     )
     fmax: int = Field(default=8000, ge=0, description="The highest frequency (in Hz).")
+    format: ImageFormat = Field(
+        default=ImageFormat.PNG,
+        description="Image format. JPEG and WebP are lossy but faster to encode.",
+    )
+    compress_level: int = Field(
+        default=1,
+        ge=0,
+        le=9,
+        description="PNG compression level (0 is fastest, 9 is smallest).",
+    )
 
     async def process(self, context: ProcessingContext) -> ImageRef:
         import io
         from PIL import Image
 
         # Get the spectrogram data
-        spec = self.tensor.to_numpy()
-
-        # Normalize the spectrogram data to 0-255 range for image
-        spec_normalized = spec - np.min(spec)
-        if np.max(spec_normalized) > 0:
-            spec_normalized = spec_normalized / np.max(spec_normalized) * 255
-
-        # Convert to uint8 for image creation
-        spec_img = spec_normalized.astype(np.uint8)
+        spec = self.tensor.to_numpy().astype(np.float32, copy=False)
+
+        # Normalize the spectrogram data to 0-255 range for image,
+        # reusing a single float32 scratch buffer for every step
+        lo, hi = spec.min(), spec.max()
+        spec_normalized = np.subtract(spec, lo, dtype=np.float32)
+        if hi > lo:
+            np.multiply(
+                spec_normalized, np.float32(255.0 / (hi - lo)), out=spec_normalized
+            )
+            np.clip(spec_normalized, 0, 255, out=spec_normalized)
+
+        # Convert to uint8 for image creation, transposing in the same pass
+        # to get frequency on y-axis and time on x-axis
+        spec_img = np.empty(spec_normalized.shape[::-1], dtype=np.uint8)
+        np.copyto(spec_img, spec_normalized.T, casting="unsafe")
 
         # Create an image from the array
-        # Transpose to get frequency on y-axis and time on x-axis
-        img = Image.fromarray(spec_img).transpose(Image.Transpose.TRANSPOSE)
+        img = Image.fromarray(spec_img)
 
         # Save to bytes buffer
         buf = io.BytesIO()
-        img.save(buf, format="PNG")
+        if self.format == self.ImageFormat.PNG:
+            img.save(buf, format="PNG", compress_level=self.compress_level)
+        elif self.format == self.ImageFormat.JPEG:
+            img.save(buf, format="JPEG", quality=85)
+        elif self.format == self.ImageFormat.WEBP:
+            img.save(buf, format="WEBP", quality=85, method=0)
+        else:
+            raise ValueError("Invalid image format")
         buf.seek(0)
 
         return await context.image_from_bytes(buf.getvalue())
@@ -285,9 +430,15 @@ class PowertToDB(BaseNode):
     tensor: NPArray = Field(
         default=NPArray(), description="The tensor containing the power spectrogram."
     )
+    precision: DBPrecision = Field(
+        default=DBPrecision.FP32,
+        description="Floating point precision of the conversion.",
+    )
 
     async def process(self, context: ProcessingContext) -> NPArray:
         power_spec = self.tensor.to_numpy()
+        if self.precision == DBPrecision.FP32:
+            return NPArray.from_numpy(_to_db(power_spec, 10.0, 1e-10, magnitude=False))
         return NPArray.from_numpy(librosa.power_to_db(power_spec, ref=np.max))
 
 
@@ -316,10 +467,12 @@ class SpectralContrast(BaseNode):
     )
 
     async def process(self, context: ProcessingContext) -> NPArray:
-        samples, sample_rate, num_channels = await context.audio_to_numpy(self.audio)
-        samples = convert_to_float(samples)
+        samples, sample_rate, _ = await cached_audio_to_numpy(context, self.audio)
+        magnitude = cached_magnitude_spectrogram(
+            context, self.audio, samples, self.n_fft, self.hop_length
+        )
         spectral_contrast = librosa.feature.spectral_contrast(
-            y=samples, sr=sample_rate, n_fft=self.n_fft, hop_length=self.hop_length
+            S=magnitude, sr=sample_rate, hop_length=self.hop_length
         )
         return NPArray.from_numpy(spectral_contrast)
 
@@ -355,17 +508,18 @@ class STFT(BaseNode):
     )
 
     async def process(self, context: ProcessingContext) -> NPArray:
-        samples, sample_rate, num_channels = await context.audio_to_numpy(self.audio)
-        samples = convert_to_float(samples)
-        stft_matrix = librosa.stft(
-            y=samples,
+        samples, sample_rate, _ = await cached_audio_to_numpy(context, self.audio)
+        magnitude = cached_magnitude_spectrogram(
+            context,
+            self.audio,
+            samples,
             n_fft=self.n_fft,
             hop_length=self.hop_length,
             win_length=self.win_length,
             window=self.window,
             center=self.center,
         )
-        return NPArray.from_numpy(np.abs(stft_matrix))
+        return NPArray.from_numpy(magnitude)
 
     @classmethod
     def get_basic_fields(cls) -> list[str]:
@@ -404,11 +558,14 @@ class SpectralCentroid(BaseNode):
         import librosa
 
         # Load the audio file
-        samples, sample_rate, _ = await context.audio_to_numpy(self.audio)
+        samples, sample_rate, _ = await cached_audio_to_numpy(context, self.audio)
 
         # Compute the spectral centroid
+        magnitude = cached_magnitude_spectrogram(
+            context, self.audio, samples, self.n_fft, self.hop_length
+        )
         centroids = librosa.feature.spectral_centroid(
-            y=samples, sr=sample_rate, n_fft=self.n_fft, hop_length=self.hop_length
+            S=magnitude, sr=sample_rate, hop_length=self.hop_length
         )
 
         # Convert to Hz and flatten
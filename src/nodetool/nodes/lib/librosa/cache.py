@@ -0,0 +1,176 @@
+import os
+import weakref
+from collections import OrderedDict
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import librosa
+import numpy as np
+
+from nodetool.metadata.types import AudioRef
+from nodetool.workflows.processing_context import ProcessingContext
+
+AUDIO_CACHE_SIZE = 4
+SPECTROGRAM_CACHE_SIZE = 8
+# STFTs longer than two chunks are computed chunk by chunk, so only one
+# chunk's complex matrix is alive per worker instead of the whole file's.
+STFT_CHUNK_FRAMES = 2048
+
+# Per-context caches. Keyed weakly so entries are dropped together with the
+# ProcessingContext that owns them.
+_audio_caches: "weakref.WeakKeyDictionary[ProcessingContext, OrderedDict]" = (
+    weakref.WeakKeyDictionary()
+)
+_spectrogram_caches: "weakref.WeakKeyDictionary[ProcessingContext, OrderedDict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _lru_get(cache: OrderedDict, key: Hashable) -> Any | None:
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache: OrderedDict, key: Hashable, value: Any, max_size: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def audio_cache_key(audio: AudioRef) -> Hashable | None:
+    """
+    Returns a key identifying the content of an AudioRef, or None if the
+    reference cannot be identified cheaply.
+    """
+    if audio.asset_id:
+        return ("asset", audio.asset_id)
+    if audio.uri:
+        return ("uri", audio.uri)
+    if isinstance(audio.data, bytes):
+        # Keyed on the payload itself so hash collisions fall back to an
+        # equality check; bytes objects cache their hash, so repeated
+        # lookups are still O(1).
+        return ("data", audio.data)
+    return None
+
+
+async def cached_audio_to_numpy(
+    context: ProcessingContext, audio: AudioRef
+) -> tuple[np.ndarray, int, int]:
+    """
+    Decodes an AudioRef to mono float samples once per context and returns
+    the memoized ``(samples, sample_rate, num_channels)`` on subsequent calls.
+
+    The returned samples are shared between callers and marked read-only.
+    """
+    key = audio_cache_key(audio)
+    cache = None
+    if key is not None:
+        cache = _audio_caches.setdefault(context, OrderedDict())
+        decoded = _lru_get(cache, key)
+        if decoded is not None:
+            return decoded
+
+    # Every consumer analyzes a single channel, so downmix while decoding
+    # rather than handing stereo to librosa to average again.
+    samples, sample_rate, num_channels = await context.audio_to_numpy(audio, mono=True)
+    samples.setflags(write=False)
+    decoded = (samples, sample_rate, num_channels)
+
+    if cache is not None:
+        _lru_put(cache, key, decoded, AUDIO_CACHE_SIZE)
+    return decoded
+
+
+def cached_magnitude_spectrogram(
+    context: ProcessingContext,
+    audio: AudioRef,
+    samples: np.ndarray,
+    n_fft: int,
+    hop_length: int,
+    win_length: int | None = None,
+    window: str = "hann",
+    center: bool = True,
+) -> np.ndarray:
+    """
+    Computes ``np.abs(librosa.stft(samples))``, reusing the result for nodes
+    that analyze the same audio with the same STFT parameters.
+
+    The returned array is shared between callers and marked read-only.
+    """
+    key = audio_cache_key(audio)
+    cache = None
+    if key is not None:
+        cache = _spectrogram_caches.setdefault(context, OrderedDict())
+        key = (key, n_fft, hop_length, win_length, window, center)
+        magnitude = _lru_get(cache, key)
+        if magnitude is not None:
+            return magnitude
+
+    magnitude = _magnitude_stft(samples, n_fft, hop_length, win_length, window, center)
+    magnitude.setflags(write=False)
+
+    if cache is not None:
+        _lru_put(cache, key, magnitude, SPECTROGRAM_CACHE_SIZE)
+    return magnitude
+
+
+def _magnitude_stft(
+    samples: np.ndarray,
+    n_fft: int,
+    hop_length: int,
+    win_length: int | None,
+    window: str,
+    center: bool,
+) -> np.ndarray:
+    if center:
+        # Same padding librosa.stft applies with center=True; after this the
+        # signal can be framed with center=False.
+        samples = np.pad(samples, n_fft // 2, mode="constant")
+
+    num_frames = 1 + (len(samples) - n_fft) // hop_length
+    if num_frames <= 2 * STFT_CHUNK_FRAMES:
+        return _magnitude(
+            librosa.stft(
+                y=samples,
+                n_fft=n_fft,
+                hop_length=hop_length,
+                win_length=win_length,
+                window=window,
+                center=False,
+            )
+        )
+
+    magnitude = np.empty((1 + n_fft // 2, num_frames), dtype=np.float32)
+
+    def compute_chunk(start_frame: int) -> None:
+        end_frame = min(start_frame + STFT_CHUNK_FRAMES, num_frames)
+        # Neighbouring chunks overlap by n_fft - hop_length samples, so the
+        # frames at chunk edges are identical to a single full-length STFT.
+        chunk = samples[start_frame * hop_length : (end_frame - 1) * hop_length + n_fft]
+        stft_matrix = librosa.stft(
+            y=chunk,
+            n_fft=n_fft,
+            hop_length=hop_length,
+            win_length=win_length,
+            window=window,
+            center=False,
+        )
+        _magnitude(stft_matrix, out=magnitude[:, start_frame:end_frame])
+
+    # The FFTs release the GIL, so chunks are computed concurrently.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(compute_chunk, range(0, num_frames, STFT_CHUNK_FRAMES)))
+    return magnitude
+
+
+def _magnitude(stft_matrix: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    # hypot over the real/imaginary views writes straight into the float32
+    # result without an intermediate |z| buffer.
+    if out is None:
+        out = np.empty(stft_matrix.shape, dtype=np.float32)
+    return np.hypot(stft_matrix.real, stft_matrix.imag, out=out)
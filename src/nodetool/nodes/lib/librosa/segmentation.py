@@ -1,12 +1,22 @@
 # File: nodetool/nodes/nodetool/audio/segmentation.py
 
+import asyncio
+from enum import Enum
 from pydantic import Field
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import AudioRef, NPArray, FolderRef
+from nodetool.nodes.lib.librosa.cache import (
+    cached_audio_to_numpy,
+    cached_magnitude_spectrogram,
+)
 import librosa
 import numpy as np
 
+# Peak threshold for the time domain onset envelope; keeps clicks over a
+# noise floor at an eighth of their level free of spurious onsets
+TIME_DOMAIN_DELTA = 0.25
+
 
 class DetectOnsets(BaseNode):
     """
@@ -17,29 +27,81 @@ class DetectOnsets(BaseNode):
     - Identify beat locations in music
     - Segment audio based on changes in energy or spectral content
     - Prepare audio for further processing or analysis
+
+    The time domain mode uses the rise of the amplitude envelope instead of
+    spectral flux. It is much faster on long recordings and is sufficient for
+    gross transients such as drum hits or the end of silence.
+
+    Setting `lag` and `max_size` above 1 turns spectral flux into SuperFlux,
+    which suppresses false onsets caused by vibrato.
     """
 
+    class OnsetDetectionMode(Enum):
+        SPECTRAL_FLUX = "spectral_flux"
+        TIME_DOMAIN = "time_domain"
+
     audio: AudioRef = Field(
         default=AudioRef(), description="The input audio file to analyze."
     )
     hop_length: int = Field(
         default=512, description="Number of samples between successive frames."
     )
+    mode: OnsetDetectionMode = Field(
+        default=OnsetDetectionMode.SPECTRAL_FLUX,
+        description="Onset detection function (spectral_flux, time_domain).",
+    )
+    lag: int = Field(
+        default=1,
+        ge=1,
+        description="Time lag in frames for computing spectral flux differences.",
+    )
+    max_size: int = Field(
+        default=1,
+        ge=1,
+        description="Size in frequency bins of the local max filter. Values above 1 enable SuperFlux.",
+    )
+
+    def _time_domain_onset_envelope(self, audio: np.ndarray) -> np.ndarray:
+        # Block-max amplitude envelope, one value per hop
+        envelope = np.maximum.reduceat(
+            np.abs(audio), np.arange(0, len(audio), self.hop_length)
+        )
+        # Positive differences mark rising energy, aligned with frame i
+        return np.maximum(np.diff(envelope, prepend=envelope[:1]), 0)
 
     async def process(self, context: ProcessingContext) -> NPArray:
         # Load the audio file
-        audio, sr, _ = await context.audio_to_numpy(self.audio)
+        audio, sr, _ = await cached_audio_to_numpy(context, self.audio)
+
+        if len(audio) == 0:
+            return NPArray.from_numpy(np.array([]))
 
         # Compute the onset strength
-        onset_env = librosa.onset.onset_strength(
-            y=audio, sr=sr, hop_length=self.hop_length
-        )
+        delta = 0.07  # librosa's default peak threshold
+        if self.mode == self.OnsetDetectionMode.TIME_DOMAIN:
+            onset_env = self._time_domain_onset_envelope(audio)
+            # The block-max envelope also rises with background noise, so
+            # peaks must stand further above the local average
+            delta = TIME_DOMAIN_DELTA
+        else:
+            magnitude = cached_magnitude_spectrogram(
+                context, self.audio, audio, 2048, self.hop_length
+            )
+            mel_spec = librosa.feature.melspectrogram(S=np.square(magnitude), sr=sr)
+            onset_env = librosa.onset.onset_strength(
+                S=librosa.power_to_db(mel_spec),
+                sr=sr,
+                hop_length=self.hop_length,
+                lag=self.lag,
+                max_size=self.max_size,
+            )
 
         # Detect onsets
         onsets = librosa.onset.onset_detect(
             onset_envelope=onset_env,
             sr=sr,
             hop_length=self.hop_length,
+            delta=delta,
         )
 
         # Convert frame indices to time
@@ -69,25 +131,35 @@ class SegmentAudioByOnsets(BaseNode):
         default=0.1, description="Minimum length of a segment in seconds."
     )
 
-    async def process(self, context: ProcessingContext) -> list[AudioRef]:
-        # Load the audio file
-        audio, sr, _ = await context.audio_to_numpy(self.audio)
-
-        # Convert onset times to samples
-        onset_samples = librosa.time_to_samples(self.onsets.to_numpy(), sr=sr)
+    def _segment_bounds(
+        self, num_samples: int, sr: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Convert onset times to samples; each segment ends at the next onset
+        # and the last one at the end of the audio
+        starts = librosa.time_to_samples(self.onsets.to_numpy(), sr=sr)
+        ends = np.append(starts[1:], num_samples)
 
-        # Add the end of the audio as the last onset
-        onset_samples = np.append(onset_samples, len(audio))
+        # Keep only segments that are long enough
+        keep = (ends - starts) / sr >= self.min_segment_length
+        return starts[keep], ends[keep]
 
-        segments = []
-        for start, end in zip(onset_samples[:-1], onset_samples[1:]):
-            # Check if the segment is long enough
-            if (end - start) / sr >= self.min_segment_length:
-                segment = audio[start:end]
-                segment_ref = await context.audio_from_numpy(segment, sr)
-                segments.append(segment_ref)
-
-        return segments
+    async def process(self, context: ProcessingContext) -> list[AudioRef]:
+        # Load the audio file
+        audio, sr, _ = await cached_audio_to_numpy(context, self.audio)
+
+        starts, ends = self._segment_bounds(len(audio), sr)
+
+        # Slices are views into the decoded buffer. audio_from_numpy encodes
+        # each one in a worker thread, so the segments are encoded
+        # concurrently with the same level and metadata as other audio nodes.
+        return list(
+            await asyncio.gather(
+                *(
+                    context.audio_from_numpy(audio[start:end], sr)
+                    for start, end in zip(starts, ends)
+                )
+            )
+        )
 
 
 class SaveAudioSegments(BaseNode):
@@ -1,6 +1,8 @@
+import math
 from enum import Enum
 from pydantic import Field
 import numpy as np
+from numba import njit, prange
 from nodetool.metadata.types import AudioRef
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.processing_context import ProcessingContext
@@ -12,6 +14,181 @@ class PitchEnvelopeCurve(Enum):
     EXPONENTIAL = "exponential"
 
 
+# Shared PCG64 generator for the noise nodes; it can draw float32 directly.
+_rng = np.random.default_rng()
+
+
+# Oscillator kernels: each evaluates the pitch envelope, accumulates the
+# per-sample phase increment and shapes the waveform in a single pass,
+# without intermediate arrays.
+
+
+@njit(fastmath=True, cache=True)
+def _pitch_mult(i, env_samples, env_step, target_mult, exponential):
+    # Frequency multiplier at sample i: a sweep from 1 to target_mult over
+    # the first env_samples samples, then held at target_mult
+    if i >= env_samples:
+        return target_mult
+    u = i * env_step
+    envelope = math.exp(-5.0 * u) if exponential else 1.0 - u
+    return 1.0 + (target_mult - 1.0) * (1.0 - envelope)
+
+
+# Samples rendered by the sine rotor between exact re-anchors; keeps the
+# recurrence's rounding drift well below 16-bit resolution.
+SINE_ROTOR_BLOCK = 1024
+
+
+@njit(fastmath=True, cache=True)
+def _sine_kernel(base_inc, env_samples, env_step, target_mult, exponential, amp, out):
+    num_samples = out.shape[0]
+    sweep = min(env_samples, num_samples)
+    phase = 0.0
+    for i in range(sweep):
+        phase += base_inc * _pitch_mult(
+            i, env_samples, env_step, target_mult, exponential
+        )
+        out[i] = amp * math.sin(phase)
+
+    # After the sweep the increment is constant, so sin(phase) is advanced by
+    # rotating (cos, sin) by the increment instead of evaluating sin per
+    # sample; each block starts from an exact sin/cos of the running phase.
+    inc = base_inc * target_mult
+    cos_inc = math.cos(inc)
+    sin_inc = math.sin(inc)
+    start = sweep
+    while start < num_samples:
+        end = min(start + SINE_ROTOR_BLOCK, num_samples)
+        s = math.sin(phase + inc)
+        c = math.cos(phase + inc)
+        for i in range(start, end):
+            out[i] = amp * s
+            s, c = s * cos_inc + c * sin_inc, c * cos_inc - s * sin_inc
+        phase += inc * (end - start)
+        start = end
+
+
+@njit(fastmath=True, cache=True)
+def _square_kernel(base_inc, env_samples, env_step, target_mult, exponential, amp, out):
+    phase = 0.0
+    for i in range(out.shape[0]):
+        phase += base_inc * _pitch_mult(
+            i, env_samples, env_step, target_mult, exponential
+        )
+        # sign(sin(phase)) from the position within the cycle, without
+        # evaluating sin
+        cycles = phase / (2.0 * math.pi)
+        out[i] = amp if cycles - math.floor(cycles) < 0.5 else -amp
+
+
+@njit(fastmath=True, cache=True)
+def _saw_kernel(base_inc, env_samples, env_step, target_mult, exponential, amp, out):
+    phase = 0.0
+    for i in range(out.shape[0]):
+        phase += base_inc * _pitch_mult(
+            i, env_samples, env_step, target_mult, exponential
+        )
+        cycles = phase / (2.0 * math.pi)
+        out[i] = amp * 2.0 * (cycles - math.floor(cycles)) - 1.0
+
+
+@njit(fastmath=True, cache=True)
+def _tri_kernel(base_inc, env_samples, env_step, target_mult, exponential, amp, out):
+    phase = 0.0
+    for i in range(out.shape[0]):
+        phase += base_inc * _pitch_mult(
+            i, env_samples, env_step, target_mult, exponential
+        )
+        cycles = phase / (2.0 * math.pi)
+        out[i] = amp * 2.0 * abs(2.0 * (cycles - math.floor(cycles)) - 1.0) - 1.0
+
+
+# Below this many samples the thread launch of the parallel FM kernel costs
+# more than it saves, so short buffers are rendered on the calling thread.
+FM_PARALLEL_MIN_SAMPLES = 1 << 14
+
+
+@njit(fastmath=True, cache=True)
+def _fm_sample(i, dt, carrier_freq, modulator_freq, modulation_index, amp):
+    # The phase is computed in float64: at 30 s float32 would be off by
+    # tenths of a radian. Only the output is stored as float32.
+    t = i * dt
+    modulator = math.sin(2.0 * math.pi * modulator_freq * t)
+    return amp * math.sin(
+        2.0 * math.pi * carrier_freq * t + modulation_index * modulator
+    )
+
+
+@njit(fastmath=True, cache=True)
+def _fm_kernel(dt, carrier_freq, modulator_freq, modulation_index, amp, out):
+    for i in range(out.shape[0]):
+        out[i] = _fm_sample(i, dt, carrier_freq, modulator_freq, modulation_index, amp)
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _fm_kernel_parallel(dt, carrier_freq, modulator_freq, modulation_index, amp, out):
+    for i in prange(out.shape[0]):
+        out[i] = _fm_sample(i, dt, carrier_freq, modulator_freq, modulation_index, amp)
+
+
+@njit(fastmath=True, cache=True)
+def _voss_kernel(samples, updates, num_rows):
+    # Voss-McCartney with staggered rows: row r changes at the samples with
+    # exactly r trailing zero bits, so each sample updates a single row and
+    # the sum of all rows is maintained incrementally. updates holds the
+    # initial row values followed by the new value drawn at each sample.
+    if samples.shape[0] == 0:
+        return
+    rows = updates[:num_rows].astype(np.float64)
+    total = rows.sum()
+    samples[0] += total
+    for i in range(1, samples.shape[0]):
+        row = 0
+        while (i >> row) & 1 == 0:
+            row += 1
+        value = updates[num_rows + i - 1]
+        total += value - rows[row]
+        rows[row] = value
+        samples[i] += total
+
+
+@njit(fastmath=True, cache=True)
+def _envelope_kernel(samples, attack_samples, decay_samples, release_samples, peak):
+    # Applies the attack/decay/release gain in place, evaluating each ramp
+    # on the same grid as np.linspace; samples is (frames, channels). The
+    # release starts from the last gain of the attack and decay ramps.
+    sustain = peak * 0.3
+    head_end = attack_samples + decay_samples
+    release_end = head_end + release_samples
+    release_start = sustain
+    for i in range(samples.shape[0]):
+        if i < attack_samples:
+            gain = peak * i / (attack_samples - 1) if attack_samples > 1 else 0.0
+        elif i < head_end:
+            j = i - attack_samples
+            gain = (
+                peak + (sustain - peak) * j / (decay_samples - 1)
+                if decay_samples > 1
+                else peak
+            )
+        elif i < release_end:
+            j = i - head_end
+            gain = (
+                release_start * (1.0 - j / (release_samples - 1))
+                if release_samples > 1
+                else release_start
+            )
+        else:
+            gain = 0.0
+        # Scale in the samples' float32 precision rather than promoting
+        # every product to float64
+        gain = np.float32(gain)
+        if i < head_end:
+            release_start = gain
+        for c in range(samples.shape[1]):
+            samples[i, c] *= gain
+
+
 class Oscillator(BaseNode):
     """
     Generates basic waveforms (sine, square, sawtooth, triangle).
@@ -64,41 +241,42 @@ class Oscillator(BaseNode):
     )
 
     async def process(self, context: ProcessingContext) -> AudioRef:
-        t = np.linspace(0, self.duration, int(self.sample_rate * self.duration))
+        num_samples = int(self.sample_rate * self.duration)
 
-        # Calculate pitch envelope
+        # Pitch envelope parameters; the kernels evaluate the envelope per
+        # sample, on the same grid as np.linspace(0, 1, env_samples)
         env_samples = int(
             min(self.pitch_envelope_time, self.duration) * self.sample_rate
         )
-        pitch_env = np.ones_like(t)
-
-        if self.pitch_envelope_amount != 0:
-            # Convert semitones to frequency multiplier
-            target_mult = 2 ** (self.pitch_envelope_amount / 12)
-
-            if self.pitch_envelope_curve == PitchEnvelopeCurve.EXPONENTIAL:
-                envelope = np.exp(-5 * np.linspace(0, 1, env_samples))
-            else:  # linear
-                envelope = np.linspace(1, 0, env_samples)
-
-            pitch_env[:env_samples] = 1 + (target_mult - 1) * (1 - envelope)
-            pitch_env[env_samples:] = target_mult
-
-        # Apply frequency modulation
-        phase = 2 * np.pi * self.frequency * np.cumsum(pitch_env) / self.sample_rate
+        env_step = 1.0 / (env_samples - 1) if env_samples > 1 else 0.0
+        # Convert semitones to frequency multiplier
+        target_mult = 2 ** (self.pitch_envelope_amount / 12)
+        exponential = self.pitch_envelope_curve == PitchEnvelopeCurve.EXPONENTIAL
+        base_inc = 2 * np.pi * self.frequency / self.sample_rate
 
         # Generate waveform
         if self.waveform == self.OscillatorWaveform.SINE:
-            samples = self.amplitude * np.sin(phase)
+            kernel = _sine_kernel
         elif self.waveform == self.OscillatorWaveform.SQUARE:
-            samples = self.amplitude * np.sign(np.sin(phase))
+            kernel = _square_kernel
         elif self.waveform == self.OscillatorWaveform.SAWTOOTH:
-            samples = self.amplitude * 2 * ((phase / (2 * np.pi)) % 1) - 1
+            kernel = _saw_kernel
         elif self.waveform == self.OscillatorWaveform.TRIANGLE:
-            samples = self.amplitude * 2 * abs(2 * ((phase / (2 * np.pi)) % 1) - 1) - 1
+            kernel = _tri_kernel
         else:
             raise ValueError("Invalid waveform type")
 
+        samples = np.empty(num_samples)
+        kernel(
+            base_inc,
+            env_samples,
+            env_step,
+            target_mult,
+            exponential,
+            self.amplitude,
+            samples,
+        )
+
         audio_segment = numpy_to_audio_segment(samples, self.sample_rate)
         return await context.audio_from_segment(audio_segment)
 
@@ -123,9 +301,10 @@ class WhiteNoise(BaseNode):
     sample_rate: int = Field(default=44100, description="Sampling rate in Hz.")
 
     async def process(self, context: ProcessingContext) -> AudioRef:
-        samples = self.amplitude * np.random.uniform(
-            -1, 1, int(self.sample_rate * self.duration)
-        )
+        # Uniform in [-amplitude, amplitude), drawn and scaled in float32
+        samples = _rng.random(int(self.sample_rate * self.duration), dtype=np.float32)
+        samples *= 2 * self.amplitude
+        samples -= self.amplitude
         audio_segment = numpy_to_audio_segment(samples, self.sample_rate)
         return await context.audio_from_segment(audio_segment)
 
@@ -152,22 +331,15 @@ class PinkNoise(BaseNode):
     async def process(self, context: ProcessingContext) -> AudioRef:
         num_samples = int(self.sample_rate * self.duration)
 
-        # Generate white noise in frequency domain
-        f_samples = np.random.normal(0, 1, num_samples)
-
-        # Create pink noise filter (1/sqrt(f))
-        freqs = np.fft.fftfreq(num_samples)
-        freqs[0] = float("inf")  # Avoid division by zero
-        pink_filter = 1 / np.sqrt(np.abs(freqs))
-
-        # Apply filter in frequency domain
-        f_pink = f_samples * pink_filter
-
-        # Convert back to time domain
-        samples = np.real(np.fft.ifft(f_pink))
+        # Voss-McCartney: a white noise term plus one random row per octave,
+        # where row r holds its value for 2**(r + 1) samples
+        num_rows = max(1, int(np.ceil(np.log2(max(num_samples, 1)))))
+        samples = _rng.standard_normal(num_samples, dtype=np.float32)
+        updates = _rng.standard_normal(num_rows + num_samples - 1, dtype=np.float32)
+        _voss_kernel(samples, updates, num_rows)
 
         # Normalize and apply amplitude
-        samples = self.amplitude * samples / np.max(np.abs(samples))
+        samples *= self.amplitude / np.max(np.abs(samples))
 
         audio_segment = numpy_to_audio_segment(samples, self.sample_rate)
         return await context.audio_from_segment(audio_segment)
@@ -205,12 +377,24 @@ class FM_Synthesis(BaseNode):
     sample_rate: int = Field(default=44100, description="Sampling rate in Hz.")
 
     async def process(self, context: ProcessingContext) -> AudioRef:
-        t = np.linspace(0, self.duration, int(self.sample_rate * self.duration))
-        modulator = np.sin(2 * np.pi * self.modulator_freq * t)
-        carrier = np.sin(
-            2 * np.pi * self.carrier_freq * t + self.modulation_index * modulator
+        num_samples = int(self.sample_rate * self.duration)
+        # Same time grid as np.linspace(0, duration, num_samples)
+        dt = self.duration / (num_samples - 1) if num_samples > 1 else 0.0
+
+        samples = np.empty(num_samples, dtype=np.float32)
+        kernel = (
+            _fm_kernel_parallel
+            if num_samples >= FM_PARALLEL_MIN_SAMPLES
+            else _fm_kernel
+        )
+        kernel(
+            dt,
+            self.carrier_freq,
+            self.modulator_freq,
+            self.modulation_index,
+            self.amplitude,
+            samples,
         )
-        samples = self.amplitude * carrier
 
         audio_segment = numpy_to_audio_segment(samples, self.sample_rate)
         return await context.audio_from_segment(audio_segment)
@@ -250,6 +434,9 @@ class Envelope(BaseNode):
         samples, sample_rate, num_channels = await context.audio_to_numpy(self.audio)
 
         total_samples = len(samples)
+        if total_samples == 0:
+            return self.audio
+
         attack_samples = int(self.attack * sample_rate)
         decay_samples = int(self.decay * sample_rate)
         release_samples = int(self.release * sample_rate)
@@ -262,40 +449,14 @@ class Envelope(BaseNode):
             decay_samples = int(decay_samples * scale)
             release_samples = total_samples - (attack_samples + decay_samples)
 
-        envelope = np.zeros(total_samples)
-        current_pos = 0
-
-        # Attack phase
-        if attack_samples > 0:
-            envelope[current_pos : current_pos + attack_samples] = np.linspace(
-                0, self.peak_amplitude, attack_samples
-            )
-            current_pos += attack_samples
-
-        # Decay phase
-        if decay_samples > 0:
-            envelope[current_pos : current_pos + decay_samples] = np.linspace(
-                self.peak_amplitude, self.peak_amplitude * 0.3, decay_samples
-            )
-            current_pos += decay_samples
-
-        # Release phase
-        if release_samples > 0:
-            start_amplitude = (
-                envelope[current_pos - 1]
-                if current_pos > 0
-                else self.peak_amplitude * 0.3
-            )
-            envelope[current_pos : current_pos + release_samples] = np.linspace(
-                start_amplitude, 0, release_samples
-            )
-            if current_pos + release_samples < total_samples:
-                envelope[current_pos + release_samples :] = 0
-
-        samples = (
-            samples * envelope[:, np.newaxis]
-            if num_channels > 1
-            else samples * envelope
+        # The release starts from wherever the decay ended; anything after
+        # it is silent
+        _envelope_kernel(
+            samples.reshape(total_samples, -1),
+            attack_samples,
+            decay_samples,
+            release_samples,
+            self.peak_amplitude,
         )
 
         return await context.audio_from_numpy(samples, sample_rate, num_channels)
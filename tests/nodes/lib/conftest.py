@@ -0,0 +1,52 @@
+import wave
+import numpy as np
+import pytest
+from nodetool.metadata.types import AudioRef, NPArray
+from nodetool.workflows.processing_context import ProcessingContext
+
+
+def _write_silent_wav(path, duration_ms: int, frame_rate: int = 44100) -> str:
+    # Same bytes pydub's AudioSegment.silent(...).export(format="wav") writes:
+    # 16-bit mono PCM zeros behind a plain RIFF header.
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(frame_rate)
+        wav.writeframes(bytes(2 * (frame_rate * duration_ms // 1000)))
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def context() -> ProcessingContext:
+    return ProcessingContext(user_id="test", auth_token="test")
+
+
+@pytest.fixture(scope="session")
+def dummy_silent_wav_path(tmp_path_factory) -> str:
+    """Five seconds of 44.1 kHz silence, encoded once per test session."""
+    return _write_silent_wav(tmp_path_factory.mktemp("audio") / "silent.wav", 5000)
+
+
+@pytest.fixture(scope="session")
+def dummy_audio(dummy_silent_wav_path: str) -> AudioRef:
+    return AudioRef(uri=dummy_silent_wav_path)
+
+
+@pytest.fixture(scope="session")
+def short_dummy_audio(tmp_path_factory) -> AudioRef:
+    """100 ms of silence for tests that only check a node's output type."""
+    path = tmp_path_factory.mktemp("audio") / "short_silent.wav"
+    return AudioRef(uri=_write_silent_wav(path, 100))
+
+
+@pytest.fixture(scope="session")
+def empty_dummy_audio(tmp_path_factory) -> AudioRef:
+    """A WAV file without any frames."""
+    path = tmp_path_factory.mktemp("audio") / "empty.wav"
+    return AudioRef(uri=_write_silent_wav(path, 0))
+
+
+@pytest.fixture(scope="session")
+def dummy_tensor() -> NPArray:
+    rng = np.random.default_rng(0)
+    return NPArray.from_numpy(rng.random((100, 100), dtype=np.float32))
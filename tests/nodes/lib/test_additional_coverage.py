@@ -1,25 +1,12 @@
 import pytest
-import tempfile
-from pydub import AudioSegment
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import AudioRef, FolderRef
 from nodetool.nodes.lib.librosa.segmentation import SaveAudioSegments
 from nodetool.nodes.lib.synthesis import Oscillator, PitchEnvelopeCurve
 
-# Create a dummy AudioRef for testing
-tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-AudioSegment.silent(duration=5000, frame_rate=44100).export(tmp.name, format="wav")
-tmp.close()
-dummy_audio = AudioRef(uri=tmp.name)
-
-
-@pytest.fixture
-def context():
-    return ProcessingContext(user_id="test", auth_token="test")
-
 
 @pytest.mark.asyncio
-async def test_save_audio_segments_node_creation():
+async def test_save_audio_segments_node_creation(dummy_audio: AudioRef):
     """Test the SaveAudioSegments node instantiation and basic validation."""
     # Create some test audio segments
     segments = [dummy_audio, dummy_audio, dummy_audio]
@@ -52,56 +39,35 @@ async def test_save_audio_segments_empty_list():
     assert node.name_prefix == "empty"
 
 
-@pytest.mark.asyncio
-@pytest.mark.parametrize(
-    "pitch_curve,pitch_amount",
-    [
-        (PitchEnvelopeCurve.LINEAR, 0.0),
-        (PitchEnvelopeCurve.LINEAR, 12.0),
-        (PitchEnvelopeCurve.LINEAR, -12.0),
-        (PitchEnvelopeCurve.EXPONENTIAL, 0.0),
-        (PitchEnvelopeCurve.EXPONENTIAL, 12.0),
-        (PitchEnvelopeCurve.EXPONENTIAL, -12.0),
-    ],
-)
-async def test_oscillator_pitch_envelope_curves(
-    context: ProcessingContext, pitch_curve, pitch_amount
-):
-    """Test Oscillator node with different pitch envelope curves and amounts."""
-    node = Oscillator(
-        duration=0.1,
-        pitch_envelope_curve=pitch_curve,
-        pitch_envelope_amount=pitch_amount,
-        pitch_envelope_time=0.05,
-    )
-
-    result = await node.process(context)
-
-    assert isinstance(result, AudioRef)
-    assert result.data is not None
-    assert len(result.data) > 0
+Waveform = Oscillator.OscillatorWaveform
 
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "waveform,pitch_curve",
+    "waveform,pitch_curve,pitch_amount,pitch_time",
     [
-        (Oscillator.OscillatorWaveform.SINE, PitchEnvelopeCurve.LINEAR),
-        (Oscillator.OscillatorWaveform.SQUARE, PitchEnvelopeCurve.LINEAR),
-        (Oscillator.OscillatorWaveform.SAWTOOTH, PitchEnvelopeCurve.EXPONENTIAL),
-        (Oscillator.OscillatorWaveform.TRIANGLE, PitchEnvelopeCurve.EXPONENTIAL),
+        (Waveform.SINE, PitchEnvelopeCurve.LINEAR, 0.0, 0.05),
+        (Waveform.SINE, PitchEnvelopeCurve.LINEAR, 12.0, 0.05),
+        (Waveform.SINE, PitchEnvelopeCurve.LINEAR, -12.0, 0.05),
+        (Waveform.SINE, PitchEnvelopeCurve.EXPONENTIAL, 0.0, 0.05),
+        (Waveform.SINE, PitchEnvelopeCurve.EXPONENTIAL, 12.0, 0.05),
+        (Waveform.SINE, PitchEnvelopeCurve.EXPONENTIAL, -12.0, 0.05),
+        (Waveform.SINE, PitchEnvelopeCurve.LINEAR, 6.0, 0.08),
+        (Waveform.SQUARE, PitchEnvelopeCurve.LINEAR, 6.0, 0.08),
+        (Waveform.SAWTOOTH, PitchEnvelopeCurve.EXPONENTIAL, 6.0, 0.08),
+        (Waveform.TRIANGLE, PitchEnvelopeCurve.EXPONENTIAL, 6.0, 0.08),
     ],
 )
-async def test_oscillator_waveforms_with_pitch_envelope(
-    context: ProcessingContext, waveform, pitch_curve
+async def test_oscillator_pitch_envelope(
+    context: ProcessingContext, waveform, pitch_curve, pitch_amount, pitch_time
 ):
-    """Test different waveforms with pitch envelope modulation."""
+    """Test Oscillator waveforms with different pitch envelope curves and amounts."""
     node = Oscillator(
         duration=0.1,
         waveform=waveform,
         pitch_envelope_curve=pitch_curve,
-        pitch_envelope_amount=6.0,  # Half octave up
-        pitch_envelope_time=0.08,
+        pitch_envelope_amount=pitch_amount,
+        pitch_envelope_time=pitch_time,
     )
 
     result = await node.process(context)
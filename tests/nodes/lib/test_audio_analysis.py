@@ -1,13 +1,14 @@
-import tempfile
+import io
 import pytest
 import numpy as np
-from pydub import AudioSegment
+from PIL import Image
 from nodetool.workflows.base_node import BaseNode
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import AudioRef, NPArray, ImageRef
 from nodetool.nodes.lib.librosa.analysis import (
     AmplitudeToDB,
     ChromaSTFT,
+    DBPrecision,
     DBToAmplitude,
     DBToPower,
     GriffinLim,
@@ -18,42 +19,202 @@ from nodetool.nodes.lib.librosa.analysis import (
     SpectralContrast,
     STFT,
 )
-
-dummy_tensor = NPArray.from_numpy(np.random.rand(100, 100))
-tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-AudioSegment.silent(5000, 44_100).export(tmp.name, format="wav")
-tmp.close()
-dummy_audio = AudioRef(uri=tmp.name)
-
-
-@pytest.fixture
-def context():
-    return ProcessingContext(user_id="test", auth_token="test")
+import librosa
+import nodetool.nodes.lib.librosa.cache as librosa_cache
+from nodetool.nodes.lib.librosa.cache import (
+    cached_audio_to_numpy,
+    cached_magnitude_spectrogram,
+)
 
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "node, expected_type",
+    "node_class, tensor_field, params, expected_type",
     [
-        (AmplitudeToDB(tensor=dummy_tensor), NPArray),
-        (ChromaSTFT(audio=dummy_audio), NPArray),
-        (DBToAmplitude(tensor=dummy_tensor), NPArray),
-        (DBToPower(tensor=dummy_tensor), NPArray),
-        (GriffinLim(magnitude_spectrogram=dummy_tensor), NPArray),
-        (MelSpectrogram(audio=dummy_audio), NPArray),
-        (MFCC(audio=dummy_audio), NPArray),
-        (PlotSpectrogram(tensor=dummy_tensor), ImageRef),
-        (PowertToDB(tensor=dummy_tensor), NPArray),
-        (SpectralContrast(audio=dummy_audio), NPArray),
-        (STFT(audio=dummy_audio), NPArray),
+        (AmplitudeToDB, "tensor", {}, NPArray),
+        (DBToAmplitude, "tensor", {}, NPArray),
+        (DBToPower, "tensor", {}, NPArray),
+        pytest.param(
+            GriffinLim, "magnitude_spectrogram", {}, NPArray, marks=pytest.mark.slow
+        ),
+        (PlotSpectrogram, "tensor", {}, ImageRef),
+        (
+            PlotSpectrogram,
+            "tensor",
+            {"format": PlotSpectrogram.ImageFormat.JPEG},
+            ImageRef,
+        ),
+        (
+            PlotSpectrogram,
+            "tensor",
+            {"format": PlotSpectrogram.ImageFormat.WEBP},
+            ImageRef,
+        ),
+        (PowertToDB, "tensor", {}, NPArray),
     ],
 )
 async def test_audio_analysis_node(
-    context: ProcessingContext, node: BaseNode, expected_type
+    context: ProcessingContext,
+    dummy_tensor: NPArray,
+    node_class: type[BaseNode],
+    tensor_field: str,
+    params: dict,
+    expected_type,
 ):
+    node = node_class(**{tensor_field: dummy_tensor}, **params)
     try:
         result = await node.process(context)
         assert result is not None
         assert isinstance(result, expected_type)
     except Exception as e:
         pytest.fail(f"Error processing {node.__class__.__name__}: {str(e)}")
+
+
+def _spectrogram_pattern(num_bins: int = 52, num_frames: int = 30) -> np.ndarray:
+    # Diagonal bands with values 0..51, which normalize to exact multiples
+    # of 5, so any flip or transpose moves every band
+    bins = np.arange(num_bins)[:, np.newaxis]
+    frames = np.arange(num_frames)[np.newaxis, :]
+    return ((bins + frames) % 52).astype(np.float64)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "image_format, pil_format, max_error",
+    [
+        (PlotSpectrogram.ImageFormat.PNG, "PNG", 0.0),
+        (PlotSpectrogram.ImageFormat.JPEG, "JPEG", 5.0),
+        (PlotSpectrogram.ImageFormat.WEBP, "WEBP", 5.0),
+    ],
+)
+async def test_plot_spectrogram_image(
+    context: ProcessingContext, image_format, pil_format, max_error
+):
+    spec = _spectrogram_pattern()
+    node = PlotSpectrogram(tensor=NPArray.from_numpy(spec), format=image_format)
+    result = await node.process(context)
+    image = Image.open(io.BytesIO(await context.asset_to_bytes(result)))
+
+    assert image.format == pil_format
+    # One column per frequency bin and one row per frame
+    assert image.size == spec.shape
+    expected = spec.T * 5
+    error = np.abs(np.asarray(image.convert("L"), dtype=np.float64) - expected)
+    assert error.mean() <= max_error
+
+
+@pytest.mark.asyncio
+async def test_plot_spectrogram_compress_level(context: ProcessingContext):
+    sizes = []
+    for level in (0, 9):
+        node = PlotSpectrogram(
+            tensor=NPArray.from_numpy(_spectrogram_pattern()), compress_level=level
+        )
+        sizes.append(len(await context.asset_to_bytes(await node.process(context))))
+
+    assert sizes[0] > sizes[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "node_class", [ChromaSTFT, MelSpectrogram, MFCC, SpectralContrast, STFT]
+)
+async def test_audio_feature_node(
+    context: ProcessingContext,
+    short_dummy_audio: AudioRef,
+    node_class: type[BaseNode],
+):
+    try:
+        result = await node_class(audio=short_dummy_audio).process(context)
+        assert result is not None
+        assert isinstance(result, NPArray)
+    except Exception as e:
+        pytest.fail(f"Error processing {node_class.__name__}: {str(e)}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("length", [None, 4000, 9000])
+async def test_griffinlim_torch_output_length(context: ProcessingContext, length):
+    pytest.importorskip("torchaudio")
+    samples = np.random.default_rng(0).standard_normal(8000, dtype=np.float32)
+    magnitude = np.abs(librosa.stft(samples, n_fft=512, hop_length=128))
+    node = GriffinLim(
+        magnitude_spectrogram=NPArray.from_numpy(magnitude),
+        hop_length=128,
+        n_iter=2,
+        length=length,
+    )
+
+    # The hop fits inside the window, so torchaudio handles the request
+    assert node._griffinlim_torch(magnitude) is not None
+
+    result = (await node.process(context)).to_numpy()
+    expected = length if length is not None else 128 * (magnitude.shape[1] - 1)
+    assert result.shape == (expected,)
+
+
+@pytest.mark.asyncio
+async def test_decoded_audio_is_shared_between_nodes(
+    context: ProcessingContext, dummy_audio: AudioRef
+):
+    first = await cached_audio_to_numpy(context, dummy_audio)
+    second = await cached_audio_to_numpy(context, dummy_audio)
+
+    assert first[0] is second[0]
+    assert not first[0].flags.writeable
+
+
+@pytest.mark.asyncio
+async def test_spectrogram_is_shared_between_nodes(
+    context: ProcessingContext, dummy_audio: AudioRef
+):
+    samples, _, _ = await cached_audio_to_numpy(context, dummy_audio)
+    first = cached_magnitude_spectrogram(context, dummy_audio, samples, 2048, 512)
+    second = cached_magnitude_spectrogram(context, dummy_audio, samples, 2048, 512)
+    other = cached_magnitude_spectrogram(context, dummy_audio, samples, 1024, 512)
+
+    assert first is second
+    assert other is not first
+    assert not first.flags.writeable
+
+
+@pytest.mark.parametrize("center", [True, False])
+def test_chunked_spectrogram_matches_full_stft(
+    context: ProcessingContext, monkeypatch, center
+):
+    monkeypatch.setattr(librosa_cache, "STFT_CHUNK_FRAMES", 16)
+    samples = np.random.default_rng(0).standard_normal(44_100, dtype=np.float32)
+    audio = AudioRef(uri=f"chunked-{center}")
+
+    magnitude = cached_magnitude_spectrogram(
+        context, audio, samples, 1024, 256, center=center
+    )
+    expected = np.abs(librosa.stft(samples, n_fft=1024, hop_length=256, center=center))
+
+    assert magnitude.shape == expected.shape
+    np.testing.assert_allclose(magnitude, expected, atol=1e-4)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("node_class", [AmplitudeToDB, PowertToDB])
+async def test_fp32_to_db_matches_librosa(
+    context: ProcessingContext, dummy_tensor: NPArray, node_class
+):
+    fp32 = await node_class(tensor=dummy_tensor).process(context)
+    fp64 = await node_class(tensor=dummy_tensor, precision=DBPrecision.FP64).process(
+        context
+    )
+
+    assert fp32.to_numpy().dtype == np.float32
+    np.testing.assert_allclose(fp32.to_numpy(), fp64.to_numpy(), atol=1e-3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("node_class", [DBToAmplitude, DBToPower])
+async def test_fp32_from_db_matches_librosa(context: ProcessingContext, node_class):
+    db = NPArray.from_numpy(np.random.default_rng(0).uniform(-80, 0, (100, 100)))
+    fp32 = await node_class(tensor=db).process(context)
+    fp64 = await node_class(tensor=db, precision=DBPrecision.FP64).process(context)
+
+    assert fp32.to_numpy().dtype == np.float32
+    np.testing.assert_allclose(fp32.to_numpy(), fp64.to_numpy(), rtol=1e-5)
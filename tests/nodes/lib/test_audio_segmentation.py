@@ -1,7 +1,6 @@
+import wave
 import pytest
 import numpy as np
-import tempfile
-from pydub import AudioSegment
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import AudioRef, NPArray
 from nodetool.nodes.lib.librosa.segmentation import (
@@ -9,34 +8,110 @@ from nodetool.nodes.lib.librosa.segmentation import (
     SegmentAudioByOnsets,
 )
 
-# Create a dummy AudioRef for testing
-tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-AudioSegment.silent(duration=5000, frame_rate=44100).export(tmp.name, format="wav")
-tmp.close()
-dummy_audio = AudioRef(uri=tmp.name)
-
 # Create a dummy Tensor for onsets
 dummy_onsets = NPArray.from_numpy(np.array([0.5, 1.0, 1.5, 2.0]))
 
 
-@pytest.fixture
-def context():
-    return ProcessingContext(user_id="test", auth_token="test")
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", list(DetectOnsets.OnsetDetectionMode))
+async def test_detect_onsets(context: ProcessingContext, dummy_audio: AudioRef, mode):
+    node = DetectOnsets(audio=dummy_audio, mode=mode)
+    result = await node.process(context)
+
+    assert isinstance(result, NPArray)
 
 
 @pytest.mark.asyncio
-async def test_detect_onsets(context: ProcessingContext):
-    node = DetectOnsets(audio=dummy_audio)
+async def test_time_domain_onsets_find_clicks(context: ProcessingContext, tmp_path):
+    # A 10 ms click every 333 ms over a noise floor, at the decoder's 32 kHz
+    sr = 32000
+    rng = np.random.default_rng(0)
+    click_times = np.arange(0.25, 10.0, 1 / 3)
+    signal = 0.1 * rng.standard_normal(10 * sr)
+    click_length = sr // 100
+    decay = np.exp(-np.arange(click_length) / (0.002 * sr))
+    for time in click_times:
+        start = int(time * sr)
+        signal[start : start + click_length] += (
+            0.8 * decay * rng.choice([-1, 1], click_length)
+        )
+    path = tmp_path / "clicks.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes((np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes())
+
+    node = DetectOnsets(
+        audio=AudioRef(uri=str(path)), mode=DetectOnsets.OnsetDetectionMode.TIME_DOMAIN
+    )
+    onsets = (await node.process(context)).to_numpy()
+
+    # Every onset lies within about one hop of a click, one per click
+    assert len(onsets) == len(click_times)
+    np.testing.assert_allclose(onsets, click_times, atol=0.02)
+
+
+@pytest.mark.asyncio
+async def test_detect_onsets_superflux(
+    context: ProcessingContext, dummy_audio: AudioRef
+):
+    node = DetectOnsets(audio=dummy_audio, lag=2, max_size=3)
     result = await node.process(context)
 
     assert isinstance(result, NPArray)
 
 
 @pytest.mark.asyncio
-async def test_segment_audio_by_onsets(context: ProcessingContext):
+async def test_segment_audio_by_onsets(
+    context: ProcessingContext, dummy_audio: AudioRef
+):
     node = SegmentAudioByOnsets(audio=dummy_audio, onsets=dummy_onsets)
     result = await node.process(context)
 
     assert isinstance(result, list)
     assert all(isinstance(segment, AudioRef) for segment in result)
     assert len(result) > 0
+
+
+@pytest.mark.asyncio
+async def test_segment_audio_by_onsets_many_segments(
+    context: ProcessingContext, dummy_audio: AudioRef
+):
+    onsets = NPArray.from_numpy(np.arange(0.0, 4.8, 0.2))
+    node = SegmentAudioByOnsets(audio=dummy_audio, onsets=onsets)
+    result = await node.process(context)
+
+    assert len(result) == len(onsets.to_numpy())
+    assert all(isinstance(segment, AudioRef) for segment in result)
+
+
+@pytest.mark.asyncio
+async def test_segments_match_audio_from_numpy(context: ProcessingContext, tmp_path):
+    # Half-scale 440 Hz tone as 16-bit PCM
+    sr = 44100
+    tone = 0.5 * np.sin(2 * np.pi * 440 * np.arange(sr) / sr)
+    path = tmp_path / "tone.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes((tone * 32767).astype(np.int16).tobytes())
+    audio = AudioRef(uri=str(path))
+
+    onsets = NPArray.from_numpy(np.array([0.0, 0.5]))
+    segments = await SegmentAudioByOnsets(audio=audio, onsets=onsets).process(context)
+    samples, _, _ = await context.audio_to_numpy(audio)
+    expected = await context.audio_from_numpy(samples[: sr // 2], sr)
+
+    assert len(segments) == 2
+    assert segments[0].uri.startswith("memory://")
+    assert segments[0].metadata == expected.metadata
+    assert segments[0].data == expected.data
+
+    # Same level as every other node writing floats through audio_from_numpy
+    segment_samples, _, _ = await context.audio_to_numpy(segments[0])
+    expected_samples, _, _ = await context.audio_to_numpy(expected)
+    assert np.max(np.abs(segment_samples)) == pytest.approx(
+        np.max(np.abs(expected_samples))
+    )
@@ -1,6 +1,6 @@
+import numpy as np
 import pytest
-import tempfile
-from pydub import AudioSegment
+from scipy.signal import welch
 from nodetool.workflows.processing_context import ProcessingContext
 from nodetool.metadata.types import AudioRef
 from nodetool.nodes.lib.synthesis import (
@@ -9,19 +9,17 @@ from nodetool.nodes.lib.synthesis import (
     PinkNoise,
     FM_Synthesis,
     Envelope,
+    SINE_ROTOR_BLOCK,
+    _envelope_kernel,
+    _fm_kernel,
+    _fm_kernel_parallel,
+    _saw_kernel,
+    _sine_kernel,
+    _square_kernel,
+    _tri_kernel,
+    _voss_kernel,
 )
 
-# Create a dummy AudioRef for Envelope tests
-_tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-AudioSegment.silent(duration=5000, frame_rate=44100).export(_tmp.name, format="wav")
-_tmp.close()
-dummy_audio = AudioRef(uri=_tmp.name)
-
-
-@pytest.fixture
-def context():
-    return ProcessingContext(user_id="test", auth_token="test")
-
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
@@ -31,7 +29,6 @@ def context():
         WhiteNoise(duration=0.1),
         PinkNoise(duration=0.1),
         FM_Synthesis(duration=0.1),
-        Envelope(audio=dummy_audio, attack=0.01, decay=0.01, release=0.01),
     ],
 )
 async def test_synthesis_nodes(context: ProcessingContext, node):
@@ -39,3 +36,149 @@ async def test_synthesis_nodes(context: ProcessingContext, node):
     assert isinstance(result, AudioRef)
     assert result.data is not None
     assert len(result.data) > 0
+
+
+@pytest.mark.asyncio
+async def test_envelope(context: ProcessingContext, short_dummy_audio: AudioRef):
+    node = Envelope(audio=short_dummy_audio, attack=0.01, decay=0.01, release=0.01)
+    result = await node.process(context)
+    assert isinstance(result, AudioRef)
+    assert result.data is not None
+    assert len(result.data) > 0
+
+
+@pytest.mark.asyncio
+async def test_envelope_empty_audio(
+    context: ProcessingContext, empty_dummy_audio: AudioRef
+):
+    node = Envelope(audio=empty_dummy_audio, attack=0.01, decay=0.01, release=0.01)
+    result = await node.process(context)
+    assert result == empty_dummy_audio
+
+
+def _reference_envelope(total, attack, decay, release, peak):
+    # The ADR curve as concatenated np.linspace ramps
+    head = np.concatenate(
+        [
+            np.linspace(0, peak, attack, dtype=np.float32),
+            np.linspace(peak, peak * 0.3, decay, dtype=np.float32),
+        ]
+    )
+    release_start = head[-1] if len(head) > 0 else peak * 0.3
+    tail = np.linspace(release_start, 0, release, dtype=np.float32)
+    return np.concatenate(
+        [head, tail, np.zeros(total - len(head) - len(tail), dtype=np.float32)]
+    )
+
+
+@pytest.mark.parametrize("attack", [0, 1, 2, 5])
+@pytest.mark.parametrize("decay", [0, 1, 2, 5])
+@pytest.mark.parametrize("release", [0, 1, 2, 5])
+def test_envelope_kernel_matches_linspace(attack, decay, release):
+    total = attack + decay + release + 3
+    samples = np.ones((total, 2), dtype=np.float32)
+    _envelope_kernel(samples, attack, decay, release, 0.8)
+
+    expected = _reference_envelope(total, attack, decay, release, 0.8)
+    np.testing.assert_allclose(samples[:, 0], expected, atol=1e-6)
+    np.testing.assert_array_equal(samples[:, 0], samples[:, 1])
+
+
+SR = 44100
+
+# (env_samples, target_mult, exponential): no pitch envelope, and octave
+# sweeps up and down over the first 0.1 s
+PITCH_ENVELOPES = [(0, 1.0, False), (4410, 2.0, True), (4410, 0.5, False)]
+
+
+def _render(kernel, frequency, num_samples, env_samples, target_mult, exponential):
+    env_step = 1.0 / (env_samples - 1) if env_samples > 1 else 0.0
+    out = np.empty(num_samples)
+    kernel(
+        2 * np.pi * frequency / SR,
+        env_samples,
+        env_step,
+        target_mult,
+        exponential,
+        0.5,
+        out,
+    )
+    return out
+
+
+def _reference_phase(frequency, num_samples, env_samples, target_mult, exponential):
+    # The accumulated phase of the original vectorized oscillator
+    pitch_env = np.ones(num_samples)
+    if env_samples > 0:
+        if exponential:
+            envelope = np.exp(-5 * np.linspace(0, 1, env_samples))
+        else:
+            envelope = np.linspace(1, 0, env_samples)
+        pitch_env[:env_samples] = 1 + (target_mult - 1) * (1 - envelope)
+        pitch_env[env_samples:] = target_mult
+    return 2 * np.pi * frequency * np.cumsum(pitch_env) / SR
+
+
+@pytest.mark.parametrize("frequency", [20.0, 441.0, 1000.5, 15000.0])
+@pytest.mark.parametrize("pitch_envelope", PITCH_ENVELOPES)
+def test_sine_kernel_matches_np_sin(frequency, pitch_envelope):
+    # Several seconds, so the rotor is re-anchored a few hundred times
+    num_samples = 5 * SR + SINE_ROTOR_BLOCK // 2
+    out = _render(_sine_kernel, frequency, num_samples, *pitch_envelope)
+    phase = _reference_phase(frequency, num_samples, *pitch_envelope)
+
+    np.testing.assert_allclose(out, 0.5 * np.sin(phase), atol=1e-8)
+
+
+@pytest.mark.parametrize("frequency", [20.0, 441.0, 1000.5, 15000.0])
+@pytest.mark.parametrize("pitch_envelope", PITCH_ENVELOPES)
+def test_shape_kernels_match_numpy(frequency, pitch_envelope):
+    # 441 Hz puts samples exactly on the cycle and half-cycle boundaries
+    phase = _reference_phase(frequency, SR, *pitch_envelope)
+    cycles = (phase / (2 * np.pi)) % 1
+    # Within rounding of a boundary either side of the jump is correct
+    at_jump = np.minimum(np.abs(cycles - np.round(cycles)), np.abs(cycles - 0.5))
+    at_jump = at_jump < 1e-9
+
+    square = _render(_square_kernel, frequency, SR, *pitch_envelope)
+    expected = 0.5 * np.sign(np.sin(phase))
+    np.testing.assert_array_equal(square[~at_jump], expected[~at_jump])
+    assert np.all(np.abs(square) == 0.5)
+
+    saw = _render(_saw_kernel, frequency, SR, *pitch_envelope)
+    error = np.abs(saw - (0.5 * 2 * cycles - 1))
+    # A sample on the wrap may land at either end of the ramp
+    np.testing.assert_allclose(np.minimum(error, np.abs(error - 1.0)), 0, atol=1e-6)
+    np.testing.assert_allclose(saw[~at_jump], 0.5 * 2 * cycles[~at_jump] - 1, atol=1e-6)
+
+    triangle = _render(_tri_kernel, frequency, SR, *pitch_envelope)
+    np.testing.assert_allclose(
+        triangle, 0.5 * 2 * np.abs(2 * cycles - 1) - 1, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize("kernel", [_fm_kernel, _fm_kernel_parallel])
+@pytest.mark.parametrize("duration", [0.1, 5.0])
+def test_fm_kernel_matches_numpy(kernel, duration):
+    num_samples = int(SR * duration)
+    t = np.linspace(0, duration, num_samples)
+    expected = 0.5 * np.sin(2 * np.pi * 440.0 * t + 5.0 * np.sin(2 * np.pi * 110.0 * t))
+
+    out = np.empty(num_samples, dtype=np.float32)
+    kernel(duration / (num_samples - 1), 440.0, 110.0, 5.0, 0.5, out)
+    np.testing.assert_allclose(out, expected, atol=1e-6)
+
+
+def test_voss_kernel_is_pink():
+    rng = np.random.default_rng(0)
+    num_samples = 1 << 18
+    num_rows = int(np.log2(num_samples))
+    samples = rng.standard_normal(num_samples, dtype=np.float32)
+    updates = rng.standard_normal(num_rows + num_samples - 1, dtype=np.float32)
+    _voss_kernel(samples, updates, num_rows)
+
+    # 1/f power falls by 3 dB per octave; white noise would be flat
+    freqs, psd = welch(samples, fs=SR, nperseg=8192)
+    band = (freqs >= 50) & (freqs <= 5000)
+    slope = np.polyfit(np.log2(freqs[band]), 10 * np.log10(psd[band]), 1)[0]
+    assert slope == pytest.approx(-3.0, abs=0.5)
@@ -1,6 +1,9 @@
 import json
+import tomllib
 from pathlib import Path
 
+import pytest
+
 PACKAGE_METADATA_PATH = (
     Path(__file__).resolve().parents[1]
     / "src"
@@ -11,29 +14,31 @@ PACKAGE_METADATA_PATH = (
 PYPROJECT_PATH = Path(__file__).resolve().parents[1] / "pyproject.toml"
 
 
-def load_metadata():
+@pytest.fixture(scope="session")
+def metadata() -> dict:
     return json.loads(PACKAGE_METADATA_PATH.read_text())
 
 
-def test_metadata_has_correct_name_and_version():
-    metadata = load_metadata()
+@pytest.fixture(scope="session")
+def properties_by_title(metadata: dict) -> dict[str, dict[str, dict]]:
+    """Node properties keyed by node title, then by property name."""
+    return {
+        node["title"]: {prop["name"]: prop for prop in node["properties"]}
+        for node in metadata["nodes"]
+    }
+
+
+@pytest.fixture(scope="session")
+def pyproject_version() -> str:
+    return tomllib.loads(PYPROJECT_PATH.read_text())["project"]["version"]
+
+
+def test_metadata_has_correct_name_and_version(metadata: dict, pyproject_version: str):
     assert metadata["name"] == "nodetool-lib-audio"
     # ensure version matches pyproject
-    pyproject_text = PYPROJECT_PATH.read_text()
-    for line in pyproject_text.splitlines():
-        if line.startswith("version"):
-            version = line.split("=")[-1].strip().strip('"')
-            break
-    else:
-        raise AssertionError("Version not found in pyproject.toml")
-    assert metadata["version"] == version
-
-
-def test_waveform_property_contains_expected_enums():
-    metadata = load_metadata()
-    nodes = metadata["nodes"]
-    oscillator_node = next(n for n in nodes if n.get("title") == "Oscillator")
-    waveform_prop = next(
-        p for p in oscillator_node["properties"] if p["name"] == "waveform"
-    )
+    assert metadata["version"] == pyproject_version
+
+
+def test_waveform_property_contains_expected_enums(properties_by_title: dict):
+    waveform_prop = properties_by_title["Oscillator"]["waveform"]
     assert waveform_prop["type"]["values"] == ["sine", "square", "sawtooth", "triangle"]